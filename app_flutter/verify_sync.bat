@@ -8,7 +8,7 @@ echo FoodVision Configuration Sync Check
 echo ========================================
 echo.
 
-python verify_sync.py
+python verify_sync.py %*
 
 if %ERRORLEVEL% NEQ 0 (
     echo.
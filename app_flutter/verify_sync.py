@@ -2,62 +2,111 @@
 """
 Version Sync Verification Script
 Ensures Android and iOS configurations are in sync with pubspec.yaml
+
+Usage: python verify_sync.py [-x | --fast-fail]
+  -x, --fast-fail   skip the report and exit 1 on the first mismatch (CI)
 """
 
 import re
 import sys
 from pathlib import Path
 
+_PUBSPEC_VERSION_RE = re.compile(r'version:\s*(\d+\.\d+\.\d+)\+(\d+)')
+_APP_ID_RE = re.compile(r'applicationId\s+"([^"]+)"')
+_MIN_SDK_RE = re.compile(r'minSdkVersion\s+(\d+)')
+_TARGET_SDK_RE = re.compile(r'targetSdkVersion\s+(\d+)')
+_IOS_KEYS_RE = re.compile(
+    r'<key>(CFBundleIdentifier|CFBundleShortVersionString|CFBundleVersion|MinimumOSVersion)</key>'
+    r'\s*<string>([^<]+)</string>'
+)
+# `key: value` lines, optionally quoted, with any trailing `# comment` dropped.
+# [ \t] rather than \s so a bare `section:` line never swallows the next line.
+_CFG_LINE_RE = re.compile(
+    r'^[ \t]*([A-Za-z_]\w*)[ \t]*:[ \t]*["\']?([^"\'#\n]*?)["\']?[ \t]*(?:#.*)?$',
+    re.M,
+)
+
 def read_pubspec_version():
     """Read version from pubspec.yaml"""
     pubspec_path = Path(__file__).parent / 'pubspec.yaml'
-    with open(pubspec_path, 'r') as f:
-        content = f.read()
-        match = re.search(r'version:\s*(\d+\.\d+\.\d+)\+(\d+)', content)
-        if match:
-            return match.group(1), match.group(2)
+    content = pubspec_path.read_text(encoding='utf-8')
+    match = _PUBSPEC_VERSION_RE.search(content)
+    if match:
+        return match.group(1), match.group(2)
     return None, None
 
 def read_android_config():
     """Read Android configuration"""
     gradle_path = Path(__file__).parent / 'android' / 'app' / 'build.gradle'
-    with open(gradle_path, 'r') as f:
-        content = f.read()
-        app_id = re.search(r'applicationId\s+"([^"]+)"', content)
-        min_sdk = re.search(r'minSdkVersion\s+(\d+)', content)
-        target_sdk = re.search(r'targetSdkVersion\s+(\d+)', content)
-        return {
-            'app_id': app_id.group(1) if app_id else None,
-            'min_sdk': min_sdk.group(1) if min_sdk else None,
-            'target_sdk': target_sdk.group(1) if target_sdk else None,
-        }
+    content = gradle_path.read_text(encoding='utf-8')
+    app_id = _APP_ID_RE.search(content)
+    min_sdk = _MIN_SDK_RE.search(content)
+    target_sdk = _TARGET_SDK_RE.search(content)
+    return {
+        'app_id': app_id.group(1) if app_id else None,
+        'min_sdk': min_sdk.group(1) if min_sdk else None,
+        'target_sdk': target_sdk.group(1) if target_sdk else None,
+    }
 
 def read_ios_config():
     """Read iOS configuration"""
     info_plist_path = Path(__file__).parent / 'ios' / 'Runner' / 'Info.plist'
-    with open(info_plist_path, 'r') as f:
-        content = f.read()
-        bundle_id = re.search(r'<key>CFBundleIdentifier</key>\s*<string>\$\(PRODUCT_BUNDLE_IDENTIFIER\)</string>', content)
-        version = re.search(r'<key>CFBundleShortVersionString</key>\s*<string>\$\(FLUTTER_BUILD_NAME\)</string>', content)
-        build = re.search(r'<key>CFBundleVersion</key>\s*<string>\$\(FLUTTER_BUILD_NUMBER\)</string>', content)
-        min_ios = re.search(r'<key>MinimumOSVersion</key>\s*<string>([^<]+)</string>', content)
-        return {
-            'uses_flutter_vars': bundle_id is not None and version is not None and build is not None,
-            'min_ios': min_ios.group(1) if min_ios else None,
-        }
+    content = info_plist_path.read_text(encoding='utf-8')
+    # One scan over the plist; the first occurrence of each key wins.
+    found = {}
+    for key, value in _IOS_KEYS_RE.findall(content):
+        found.setdefault(key, value)
+    return {
+        'uses_flutter_vars': (
+            found.get('CFBundleIdentifier') == '$(PRODUCT_BUNDLE_IDENTIFIER)'
+            and found.get('CFBundleShortVersionString') == '$(FLUTTER_BUILD_NAME)'
+            and found.get('CFBundleVersion') == '$(FLUTTER_BUILD_NUMBER)'
+        ),
+        'min_ios': found.get('MinimumOSVersion'),
+    }
 
 def read_app_config():
     """Read app_config.yaml"""
     config_path = Path(__file__).parent / 'app_config.yaml'
-    config = {}
-    with open(config_path, 'r') as f:
-        for line in f:
-            if ':' in line and not line.strip().startswith('#'):
-                key, value = line.split(':', 1)
-                config[key.strip()] = value.strip().strip('"').strip("'")
-    return config
+    return dict(_CFG_LINE_RE.findall(config_path.read_text(encoding='utf-8')))
+
+def iter_checks(app_config=None, android_config=None, ios_config=None):
+    """
+    Yield (ok, message) for each sync check, cheapest first.
+
+    Configs that are not passed in are read lazily, so a consumer that stops
+    at the first failure never touches the files behind later checks.
+    """
+    if app_config is None:
+        app_config = read_app_config()
+    if android_config is None:
+        android_config = read_android_config()
+    yield (
+        android_config['app_id'] == app_config.get('package_name'),
+        f"❌ Android applicationId mismatch: {android_config['app_id']} != {app_config.get('package_name')}",
+    )
+
+    if ios_config is None:
+        ios_config = read_ios_config()
+    yield (
+        ios_config['uses_flutter_vars'],
+        "❌ iOS Info.plist not using Flutter variables (FLUTTER_BUILD_NAME, FLUTTER_BUILD_NUMBER)",
+    )
+
+def fast_fail():
+    """Run checks only, stopping at the first error (for CI)."""
+    for ok, msg in iter_checks():
+        if not ok:
+            print(msg)
+            return 1
+    print("✅ All configurations are in sync!")
+    return 0
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if '-x' in argv or '--fast-fail' in argv:
+        return fast_fail()
 
-def main():
     print("🔍 FoodVision Configuration Sync Check\n" + "="*50)
     
     # Read all configs
@@ -66,7 +115,7 @@ def main():
     ios_config = read_ios_config()
     app_config = read_app_config()
     
-    errors = []
+    errors = [msg for ok, msg in iter_checks(app_config, android_config, ios_config) if not ok]
     warnings = []
     
     # Check version synced from pubspec.yaml
@@ -80,17 +129,11 @@ def main():
     print(f"  Min SDK: {android_config['min_sdk']}")
     print(f"  Target SDK: {android_config['target_sdk']}")
     
-    if android_config['app_id'] != app_config.get('package_name'):
-        errors.append(f"❌ Android applicationId mismatch: {android_config['app_id']} != {app_config.get('package_name')}")
-    
     # Check iOS
     print(f"\n🍎 iOS Configuration:")
     print(f"  Uses Flutter Variables: {ios_config['uses_flutter_vars']}")
     print(f"  Min iOS Version: {ios_config['min_ios']}")
     
-    if not ios_config['uses_flutter_vars']:
-        errors.append("❌ iOS Info.plist not using Flutter variables (FLUTTER_BUILD_NAME, FLUTTER_BUILD_NUMBER)")
-    
     # Check app_config.yaml
     print(f"\n⚙️  App Config (app_config.yaml):")
     print(f"  Bundle ID: {app_config.get('package_name')}")
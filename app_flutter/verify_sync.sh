@@ -8,7 +8,7 @@ echo "FoodVision Configuration Sync Check"
 echo "========================================"
 echo ""
 
-python3 verify_sync.py
+python3 verify_sync.py "$@"
 
 if [ $? -ne 0 ]; then
     echo ""
@@ -6,16 +6,20 @@ POST /meals          — persist a confirmed meal via db_factory (Firestore / SQ
 GET  /meals/today    — daily totals from db_factory
 """
 
+import asyncio
+import functools
 import logging
-import json
 import uuid
 import csv
 import os
+import time
 from collections import Counter
+from dataclasses import dataclass
 from io import StringIO, BytesIO
 from datetime import date, datetime
-from typing import List, Optional, Literal
+from typing import Any, Dict, List, Optional, Literal
 
+import orjson
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
@@ -30,7 +34,9 @@ from app.models.schemas import (
     SaveMealRequest,
 )
 from app.services.analysis import (
+    analyze_image_streams,
     analyze_images,
+    gemini_analysis_enabled,
     get_feedback_rule_observability,
     set_feedback_rules_enabled,
 )
@@ -39,11 +45,48 @@ from app.services.nutrition import get_food_fuzzy, compute_macros_from_food
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+MAX_IMAGE_BYTES = int(os.getenv("NUTRILENS_MAX_IMAGE_BYTES", str(15 * 1024 * 1024)))
+_UPLOAD_CHUNK_BYTES = 64 * 1024
+
 
 class FeedbackRulesToggleRequest(BaseModel):
     enabled: bool
 
 
+@dataclass(slots=True)
+class EmbeddedItem:
+    """Meal item as stored on the meal document; converted to a dict only at write time."""
+    food_id: str
+    label: str
+    grams: int
+    kcal: int
+    protein_g: float
+    carbs_g: float
+    fat_g: float
+    original_label: Optional[str] = None
+    original_grams: Optional[int] = None
+    corrected: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "food_id": self.food_id,
+            "label": self.label,
+            "grams": self.grams,
+            "kcal": self.kcal,
+            "protein_g": self.protein_g,
+            "carbs_g": self.carbs_g,
+            "fat_g": self.fat_g,
+        }
+        # Optional correction fields are only stored when present.
+        if self.original_label is not None:
+            data["original_label"] = self.original_label
+        if self.original_grams is not None:
+            data["original_grams"] = self.original_grams
+        if self.corrected:
+            data["corrected"] = True
+        return data
+
+
 def _require_access_admin(current_user: str) -> None:
     user = auth_db.get_user_by_username(current_user)
     if user and user.get("is_admin"):
@@ -58,6 +101,28 @@ def _require_access_admin(current_user: str) -> None:
         raise HTTPException(status_code=403, detail="Admin access required")
 
 
+async def _read_upload_capped(upload: UploadFile, max_bytes: int) -> bytes:
+    """Read an uploaded file in chunks, failing fast once it exceeds max_bytes."""
+    data = bytearray()
+    while chunk := await upload.read(_UPLOAD_CHUNK_BYTES):
+        data += chunk
+        if len(data) > max_bytes:
+            raise HTTPException(status_code=413, detail="Image too large")
+    return bytes(data)
+
+
+@functools.lru_cache(maxsize=1)
+def _utc_date_for_minute(minute_bucket: int) -> str:
+    # Derived from the bucket itself; UTC midnight always falls on a minute
+    # boundary, so the cached value can never lag the day rollover.
+    return datetime.utcfromtimestamp(minute_bucket * 60).date().isoformat()
+
+
+def _utc_today_str() -> str:
+    """Today's UTC date as YYYY-MM-DD, recomputed at most once per minute."""
+    return _utc_date_for_minute(int(time.time()) // 60)
+
+
 def _parse_date(date_str: str) -> datetime:
     try:
         return datetime.strptime(date_str, "%Y-%m-%d")
@@ -84,15 +149,25 @@ async def analyze_meal(
     meta_dict = {}
     if metadata:
         try:
-            meta_dict = json.loads(metadata)
-        except json.JSONDecodeError:
+            meta_dict = orjson.loads(metadata)
+        except orjson.JSONDecodeError:
             logger.warning("Failed to parse metadata JSON")
 
-    image_bytes = [await img.read() for img in images]
+    if gemini_analysis_enabled():
+        image_bytes = await asyncio.gather(
+            *(_read_upload_capped(img, MAX_IMAGE_BYTES) for img in images)
+        )
+    else:
+        # Deterministic analysis only hashes a prefix of the first image, so
+        # the uploads are not buffered; the size cap uses the parsed sizes.
+        if any(img.size is not None and img.size > MAX_IMAGE_BYTES for img in images):
+            raise HTTPException(status_code=413, detail="Image too large")
+        image_bytes = None
 
     try:
-        analysis = await analyze_images(image_bytes, meta_dict)
-        return analysis
+        if image_bytes is None:
+            return await analyze_image_streams(images, meta_dict)
+        return await analyze_images(image_bytes, meta_dict)
     except Exception as e:
         logger.error(f"Analysis failed: {e}")
         raise HTTPException(status_code=500, detail="Analysis failed")
@@ -112,9 +187,8 @@ async def save_meal(request: SaveMealRequest):
     meal_id = str(uuid.uuid4())
     timestamp = (request.timestamp or datetime.utcnow()).isoformat()
 
-    embedded_items: List[dict] = []
+    embedded_items: List[EmbeddedItem] = []
     correction_events: List[dict] = []
-    total_kcal = 0
     unmatched: List[str] = []
 
     for item in request.items:
@@ -134,21 +208,20 @@ async def save_meal(request: SaveMealRequest):
             macros = compute_macros_from_food(food, item.grams)
             food_id = food.get("food_id", "unknown")
 
-        total_kcal += macros["kcal"]
-        embedded_item = {
-            "food_id": food_id,
-            "label": item.label,
-            "grams": item.grams,
-            **macros,
-        }
+        embedded_items.append(EmbeddedItem(
+            food_id=food_id,
+            label=item.label,
+            grams=item.grams,
+            kcal=macros["kcal"],
+            protein_g=macros["protein_g"],
+            carbs_g=macros["carbs_g"],
+            fat_g=macros["fat_g"],
+            original_label=item.original_label,
+            original_grams=item.original_grams,
+            corrected=item.corrected,
+        ))
 
-        if item.original_label is not None:
-            embedded_item["original_label"] = item.original_label
-        if item.original_grams is not None:
-            embedded_item["original_grams"] = item.original_grams
         if item.corrected:
-            embedded_item["corrected"] = True
-
             corrected_grams = int(item.grams)
             original_grams = int(item.original_grams or item.grams)
             correction_events.append({
@@ -164,13 +237,18 @@ async def save_meal(request: SaveMealRequest):
                 "grams_delta": corrected_grams - original_grams,
             })
 
-        embedded_items.append(embedded_item)
-
+    total_kcal = sum(i.kcal for i in embedded_items)
     db.save_meal(
         meal_id=meal_id,
         timestamp=timestamp,
         notes=request.notes,
-        items=embedded_items,
+        items=[i.to_dict() for i in embedded_items],
+        totals={
+            "total_kcal": total_kcal,
+            "total_protein_g": round(sum(i.protein_g for i in embedded_items), 1),
+            "total_carbs_g": round(sum(i.carbs_g for i in embedded_items), 1),
+            "total_fat_g": round(sum(i.fat_g for i in embedded_items), 1),
+        },
     )
 
     correction_count = 0
@@ -325,15 +403,34 @@ async def update_feedback_rules_runtime_status(
 
 
 @router.get("/today", response_model=MealTotalResponse)
-async def get_meals_today(date: Optional[str] = None):
+async def get_meals_today(date: Optional[str] = None, include_items: bool = True):
     """
     GET /meals/today
 
     Returns totals for all meals saved today (UTC date).
     Reads embedded item macros — no re-join needed.
+
+    With `include_items=false` the day totals come from the per-meal totals
+    denormalised at save time and the meal list omits embedded items.
     """
-    target_date = date or datetime.utcnow().date().isoformat()  # "YYYY-MM-DD"
+    target_date = date or _utc_today_str()  # "YYYY-MM-DD"
     _parse_date(target_date)
+
+    if not include_items:
+        # Independent reads: overlap them on worker threads.
+        summaries, totals = await asyncio.gather(
+            asyncio.to_thread(db.get_meal_summaries_by_date, target_date),
+            asyncio.to_thread(db.get_meal_totals_by_date, target_date),
+        )
+        return MealTotalResponse(
+            total_kcal=int(totals["total_kcal"]),
+            total_protein_g=round(totals["total_protein_g"], 1),
+            total_carbs_g=round(totals["total_carbs_g"], 1),
+            total_fat_g=round(totals["total_fat_g"], 1),
+            meal_count=len(summaries),
+            meals=summaries,
+        )
+
     meals = db.get_meals_by_date(target_date)
 
     total_kcal = 0
@@ -343,17 +440,28 @@ async def get_meals_today(date: Optional[str] = None):
     meal_summaries = []
 
     for meal in meals:
-        meal_kcal = sum(it.get("kcal", 0) for it in meal.get("items", []))
+        items = meal.get("items", [])
+        meal_kcal = 0
+        meal_protein = meal_carbs = meal_fat = 0.0
+        item_count = 0
+        # Single pass over the embedded items instead of one sum() per macro.
+        for it in items:
+            meal_kcal += it.get("kcal", 0)
+            meal_protein += it.get("protein_g", 0.0)
+            meal_carbs += it.get("carbs_g", 0.0)
+            meal_fat += it.get("fat_g", 0.0)
+            item_count += 1
+
         total_kcal += meal_kcal
-        total_protein += sum(it.get("protein_g", 0.0) for it in meal.get("items", []))
-        total_carbs += sum(it.get("carbs_g", 0.0) for it in meal.get("items", []))
-        total_fat += sum(it.get("fat_g", 0.0) for it in meal.get("items", []))
+        total_protein += meal_protein
+        total_carbs += meal_carbs
+        total_fat += meal_fat
         meal_summaries.append({
             "meal_id": meal.get("meal_id"),
             "timestamp": meal.get("timestamp"),
-            "item_count": len(meal.get("items", [])),
+            "item_count": item_count,
             "total_kcal": meal_kcal,
-            "items": meal.get("items", []),
+            "items": items,
             "notes": meal.get("notes", ""),
         })
 
@@ -540,3 +648,17 @@ async def export_meals(start: str, end: str, format: Literal["csv", "pdf"] = "cs
         media_type="application/pdf",
         headers={"Content-Disposition": f'attachment; filename="nutrilens_meals_{file_suffix}.pdf"'},
     )
+
+
+# Declared last so the catch-all path does not shadow /today, /range, /export.
+@router.get("/{meal_id}")
+async def get_meal(meal_id: str):
+    """
+    GET /meals/{meal_id}
+
+    Returns a single saved meal with its embedded items.
+    """
+    meal = db.get_meal_by_id(meal_id)
+    if meal is None:
+        raise HTTPException(status_code=404, detail="Meal not found")
+    return meal
@@ -7,7 +7,9 @@ Collections:
 
 Document shape:
   foods:  { food_id, name, kcal_per_100g, protein_g_per_100g, carbs_g_per_100g, fat_g_per_100g }
-  meals:  { meal_id, timestamp, date_str, notes, items: [{food_id, grams, kcal, protein_g, carbs_g, fat_g, label}] }
+  meals:  { meal_id, timestamp, date_str, notes, item_count,
+            total_kcal, total_protein_g, total_carbs_g, total_fat_g,
+            items: [{food_id, grams, kcal, protein_g, carbs_g, fat_g, label}] }
 """
 
 from __future__ import annotations
@@ -19,6 +21,16 @@ from typing import Any, Dict, List, Optional
 from google.cloud import firestore
 
 
+def _meal_totals(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Denormalised meal totals derived from embedded items."""
+    return {
+        "total_kcal": sum(it.get("kcal", 0) for it in items),
+        "total_protein_g": round(sum(it.get("protein_g", 0.0) for it in items), 1),
+        "total_carbs_g": round(sum(it.get("carbs_g", 0.0) for it in items), 1),
+        "total_fat_g": round(sum(it.get("fat_g", 0.0) for it in items), 1),
+    }
+
+
 class NutriLensFirestoreDB:
     FOODS = "nutrilens_foods"
     MEALS = "nutrilens_meals"
@@ -26,9 +38,19 @@ class NutriLensFirestoreDB:
     SETTINGS = "nutrilens_settings"
     SETTINGS_AUDIT = "nutrilens_settings_audit"
 
+    # Firestore caps a single WriteBatch at 500 operations; stay below it.
+    BATCH_LIMIT = 450
+
+    MEAL_TOTAL_FIELDS = ["total_kcal", "total_protein_g", "total_carbs_g", "total_fat_g"]
+    MEAL_SUMMARY_FIELDS = ["meal_id", "timestamp", "date_str", "notes", "item_count", *MEAL_TOTAL_FIELDS]
+    # nutrilens_settings key recording that backfill_meal_totals() has run.
+    MEAL_TOTALS_BACKFILL_SETTING = "meal_totals_backfilled"
+
     def __init__(self) -> None:
         project_id = os.getenv("GCP_PROJECT_ID", "leave-tracker-2025")
         self.db = firestore.Client(project=project_id)
+        # Bumped on every catalogue write; nutrition.get_food_index() rebuilds on change.
+        self.foods_version = 0
 
     # ==================== FOODS ====================
 
@@ -37,14 +59,34 @@ class NutriLensFirestoreDB:
         Idempotent bulk-insert of foods.
         Uses food_id as Firestore document ID to avoid duplicates.
         Returns the number of newly inserted documents.
+
+        Existing IDs are fetched in one query projected to __name__ (an empty
+        projection would return every field) and new documents are written
+        through WriteBatch, instead of a get()/set() round-trip per food.
         """
+        collection = self.db.collection(self.FOODS)
+        existing = {d.id for d in collection.select(["__name__"]).stream()}
+
+        batch = self.db.batch()
+        pending = 0
         inserted = 0
         for food in foods:
             fid = food["food_id"]
-            ref = self.db.collection(self.FOODS).document(fid)
-            if not ref.get().exists:
-                ref.set(food)
-                inserted += 1
+            if fid in existing:
+                continue
+            batch.set(collection.document(fid), food)
+            existing.add(fid)
+            pending += 1
+            inserted += 1
+            if pending == self.BATCH_LIMIT:
+                batch.commit()
+                batch = self.db.batch()
+                pending = 0
+
+        if pending:
+            batch.commit()
+        if inserted:
+            self.foods_version += 1
         return inserted
 
     def _map_food_fields(self, food_doc: Dict[str, Any]) -> Dict[str, Any]:
@@ -87,9 +129,9 @@ class NutriLensFirestoreDB:
         return None
 
     def get_food_count(self) -> int:
-        """Return total number of food documents."""
-        docs = self.db.collection(self.FOODS).stream()
-        return sum(1 for _ in docs)
+        """Return total number of food documents (server-side count aggregation)."""
+        result = self.db.collection(self.FOODS).count().get()
+        return int(result[0][0].value)
 
     def save_food(self, food: Dict[str, Any]) -> Dict[str, Any]:
         """Save or update a food document."""
@@ -107,11 +149,13 @@ class NutriLensFirestoreDB:
             db_food["fat_g_per_100g"] = db_food.pop("fat_per_100g")
         
         self.db.collection(self.FOODS).document(food_id).set(db_food)
+        self.foods_version += 1
         return food  # Return original food with API schema
 
     def delete_food(self, food_id: str) -> None:
         """Delete a food document."""
         self.db.collection(self.FOODS).document(food_id).delete()
+        self.foods_version += 1
 
     # ==================== MEALS ====================
 
@@ -121,19 +165,27 @@ class NutriLensFirestoreDB:
         timestamp: str,
         notes: Optional[str],
         items: List[Dict[str, Any]],
+        totals: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
         Persist a meal as a single Firestore document (denormalised, items embedded).
 
         `items` each contain: food_id, grams, kcal, protein_g, carbs_g, fat_g, label
         `date_str` (YYYY-MM-DD, UTC) is stored as a filterable top-level field.
+        `totals` (total_kcal, total_protein_g, total_carbs_g, total_fat_g) and
+        `item_count` are stored top-level so reads can skip `items`; totals are
+        derived from `items` when the caller does not supply them.
         """
         date_str = timestamp[:10]  # "2025-02-28T12:34:56" → "2025-02-28"
+        if totals is None:
+            totals = _meal_totals(items)
         data: Dict[str, Any] = {
             "meal_id": meal_id,
             "timestamp": timestamp,
             "date_str": date_str,
             "notes": notes or "",
+            "item_count": len(items),
+            **totals,
             "items": items,
         }
         self.db.collection(self.MEALS).document(meal_id).set(data)
@@ -150,6 +202,75 @@ class NutriLensFirestoreDB:
         )
         return [{"id": d.id, **d.to_dict()} for d in docs]
 
+    def get_meal_summaries_by_date(self, date_str: str) -> List[Dict[str, Any]]:
+        """
+        Return lightweight summaries for meals on date_str (YYYY-MM-DD).
+
+        Uses a field projection so the embedded `items` arrays are never
+        transferred; totals come from the fields denormalised in save_meal().
+        """
+        docs = (
+            self.db.collection(self.MEALS)
+            .where("date_str", "==", date_str)
+            .select(self.MEAL_SUMMARY_FIELDS)
+            .stream()
+        )
+        return [{"id": d.id, **d.to_dict()} for d in docs]
+
+    def get_meal_totals_by_date(self, date_str: str) -> Dict[str, Any]:
+        """
+        Sum the denormalised meal totals for date_str in one aggregation RPC.
+
+        Meals saved before totals were stored on the document get them from
+        backfill_meal_totals(), which runs once at startup.
+        """
+        query = self.db.collection(self.MEALS).where("date_str", "==", date_str)
+        aggregation = query.sum(self.MEAL_TOTAL_FIELDS[0], alias=self.MEAL_TOTAL_FIELDS[0])
+        for field in self.MEAL_TOTAL_FIELDS[1:]:
+            aggregation = aggregation.sum(field, alias=field)
+        results = aggregation.get()
+        values = {result.alias: result.value for result in results[0]} if results else {}
+        return {field: values.get(field) or 0 for field in self.MEAL_TOTAL_FIELDS}
+
+    def backfill_meal_totals(self) -> int:
+        """
+        One-off: store item_count / total_* on meals saved before those fields
+        were denormalised, so summaries and day totals do not count them as 0.
+
+        Completion is recorded in nutrilens_settings; later calls return 0
+        without reading the meals collection. Returns the number of meals updated.
+        """
+        if self.get_nutrilens_setting(self.MEAL_TOTALS_BACKFILL_SETTING):
+            return 0
+
+        batch = self.db.batch()
+        pending = 0
+        updated = 0
+        for doc in self.db.collection(self.MEALS).stream():
+            data = doc.to_dict() or {}
+            if "item_count" in data and all(f in data for f in self.MEAL_TOTAL_FIELDS):
+                continue
+            items = data.get("items") or []
+            batch.update(doc.reference, {"item_count": len(items), **_meal_totals(items)})
+            pending += 1
+            updated += 1
+            if pending == self.BATCH_LIMIT:
+                batch.commit()
+                batch = self.db.batch()
+                pending = 0
+
+        if pending:
+            batch.commit()
+        self.set_nutrilens_setting(self.MEAL_TOTALS_BACKFILL_SETTING, "true", "system")
+        return updated
+
+    def get_meal_by_id(self, meal_id: str) -> Optional[Dict[str, Any]]:
+        """Return a single meal document (with embedded items) by meal_id."""
+        doc = self.db.collection(self.MEALS).document(meal_id).get()
+        if doc.exists:
+            return {"id": doc.id, **doc.to_dict()}
+        return None
+
     def get_meals_by_date_range(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
         """
         Return all meals between start_date and end_date (inclusive, YYYY-MM-DD format).
@@ -4,7 +4,7 @@ SQLAlchemy models for database tables — Milestone 3.
 
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Computed, Integer, String, Float, DateTime, ForeignKey
 from sqlalchemy.orm import relationship, declarative_base
 
 Base = declarative_base()
@@ -20,19 +20,37 @@ class Food(Base):
     protein_g_per_100g = Column(Float, nullable=False)
     carbs_g_per_100g = Column(Float, nullable=False)
     fat_g_per_100g = Column(Float, nullable=False)
+    # Indexed lowercase copy of name for case-insensitive point lookups.
+    name_lc = Column(String, Computed("lower(name)", persisted=False), index=True)
 
     meal_items = relationship("MealItem", back_populates="food")
 
 
+# Adds name_lc in place to a foods table created before it existed (VIRTUAL
+# generated columns can be added by ALTER TABLE). Shared by session.init_db
+# and the raw sqlite3 backend so both paths produce the same schema.
+FOODS_ADD_NAME_LC_SQL = (
+    "ALTER TABLE foods ADD COLUMN name_lc TEXT "
+    "GENERATED ALWAYS AS (lower(name)) VIRTUAL"
+)
+
+
 class Meal(Base):
     """Saved meal records"""
     __tablename__ = "meals"
 
     meal_id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    timestamp = Column(DateTime, nullable=False, default=datetime.utcnow)
+    timestamp = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
     notes = Column(String)
 
-    items = relationship("MealItem", back_populates="meal", cascade="all, delete-orphan")
+    # Eager strategies so iterating meal.items / item.food never issues a
+    # lazy SELECT per row: items load in one IN query, foods are joined in.
+    items = relationship(
+        "MealItem",
+        back_populates="meal",
+        cascade="all, delete-orphan",
+        lazy="selectin",
+    )
 
 
 class MealItem(Base):
@@ -40,9 +58,9 @@ class MealItem(Base):
     __tablename__ = "meal_items"
 
     item_id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    meal_id = Column(String, ForeignKey("meals.meal_id"), nullable=False)
+    meal_id = Column(String, ForeignKey("meals.meal_id"), nullable=False, index=True)
     food_id = Column(String, ForeignKey("foods.food_id"), nullable=False)
     grams = Column(Integer, nullable=False)
 
     meal = relationship("Meal", back_populates="items")
-    food = relationship("Food", back_populates="meal_items")
+    food = relationship("Food", back_populates="meal_items", lazy="joined")
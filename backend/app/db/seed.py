@@ -4,10 +4,19 @@ Seeds ~55 common foods (per 100g) including Malaysian/Asian staples.
 
 Run via:  python -m app.db.seed
 Or called automatically from main.py on startup if DB is empty.
+
+main.py only needs FOOD_SEED_DICTS (it seeds through db_factory), so the
+SQLAlchemy models are imported lazily to keep the ORM off the API's
+cold-start path.
 """
 
-from sqlalchemy.orm import Session
-from app.db.models import Food
+from __future__ import annotations
+
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Mapping, Tuple
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
 
 # ─────────────────────────────────────────────────────────────
 # Food data: (food_id, name, kcal, protein_g, carbs_g, fat_g)
@@ -87,33 +96,42 @@ FOOD_SEED_DATA = [
     ("peanut_sauce",    "peanut sauce",      220,  8.0, 14.0, 17.0),  # satay sauce
 ]
 
+# Dict form of FOOD_SEED_DATA for db_factory.seed_foods(), built once at import.
+# Read-only views so callers cannot mutate the shared master copy.
+FOOD_SEED_FIELDS = (
+    "food_id",
+    "name",
+    "kcal_per_100g",
+    "protein_g_per_100g",
+    "carbs_g_per_100g",
+    "fat_g_per_100g",
+)
+FOOD_SEED_DICTS: Tuple[Mapping[str, Any], ...] = tuple(
+    MappingProxyType(dict(zip(FOOD_SEED_FIELDS, row))) for row in FOOD_SEED_DATA
+)
+
 
 def seed_foods(db: Session) -> int:
     """
     Insert seed foods into the database.
-    Skips foods that already exist (upsert by food_id).
+    Skips foods that already exist: one SELECT of the existing food_ids, then a
+    single Core INSERT of the missing rows and one commit (no ORM unit of work).
 
     Returns:
         Number of new rows inserted.
     """
-    inserted = 0
-    for food_id, name, kcal, protein, carbs, fat in FOOD_SEED_DATA:
-        existing = db.get(Food, food_id)
-        if existing is None:
-            db.add(Food(
-                food_id=food_id,
-                name=name,
-                kcal_per_100g=kcal,
-                protein_g_per_100g=protein,
-                carbs_g_per_100g=carbs,
-                fat_g_per_100g=fat,
-            ))
-            inserted += 1
-    db.commit()
-    return inserted
+    from sqlalchemy import insert, select
+    from app.db.models import Food
 
+    existing_ids = set(db.scalars(select(Food.food_id)))
+    new_rows = [dict(food) for food in FOOD_SEED_DICTS if food["food_id"] not in existing_ids]
+    if new_rows:
+        db.execute(insert(Food).values(new_rows))
+    db.commit()
+    return len(new_rows)
 
 if __name__ == "__main__":
+    from app.db.models import Food
     from app.db.session import SessionLocal, init_db
 
     init_db()
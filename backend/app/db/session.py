@@ -2,9 +2,10 @@
 Database session and connection management — Milestone 3.
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
-from app.db.models import Base
+from sqlalchemy.pool import StaticPool
+from app.db.models import Base, FOODS_ADD_NAME_LC_SQL
 
 # Keep SQLAlchemy dev path aligned with unified local SQLite file.
 DATABASE_URL = "sqlite:///./unified_dev.db"
@@ -12,8 +13,23 @@ DATABASE_URL = "sqlite:///./unified_dev.db"
 engine = create_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False},  # required for SQLite + FastAPI
+    poolclass=StaticPool,  # one shared connection for the single SQLite file
 )
 
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply WAL, cache and foreign-key PRAGMAs to every new raw SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -26,6 +42,24 @@ def get_db():
         db.close()
 
 
-def init_db():
-    """Create all tables if they don't exist."""
-    Base.metadata.create_all(bind=engine)
+def _add_missing_columns(bind) -> None:
+    """
+    create_all() never alters existing tables, so columns added to the models
+    later are added here. foods.name_lc is a VIRTUAL generated column, which
+    SQLite can add in place.
+    """
+    with bind.begin() as conn:
+        columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_xinfo(foods)")}
+        if "name_lc" not in columns:
+            conn.exec_driver_sql(FOODS_ADD_NAME_LC_SQL)
+
+
+def init_db(bind=engine):
+    """Create all tables (and any columns / indexes missing from existing tables)."""
+    Base.metadata.create_all(bind=bind)
+    _add_missing_columns(bind)
+    # create_all() skips tables that already exist, so indexes added to the
+    # models later (e.g. meals.timestamp) are created here instead.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
@@ -11,12 +11,71 @@ Collections map to plain SQLite tables:
 
 from __future__ import annotations
 
-import json
+import atexit
 import os
 import sqlite3
+import string
+import threading
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
+
+import orjson
+
+from app.db.models import FOODS_ADD_NAME_LC_SQL
+
+# Per-connection tuning. journal_mode=WAL is persistent in the database file,
+# so it is set once in _create_tables rather than on every connect.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",  # 64 MiB page cache
+    "PRAGMA mmap_size=268435456",  # 256 MiB
+)
+
+# Explicit column lists; rows come back as plain tuples and are zipped with
+# the matching key tuple. Food keys are the API names (no _g suffix).
+_FOOD_COLS = "food_id, name, kcal_per_100g, protein_g_per_100g, carbs_g_per_100g, fat_g_per_100g"
+_FOOD_KEYS = ("food_id", "name", "kcal_per_100g", "protein_per_100g", "carbs_per_100g", "fat_per_100g")
+_MEAL_COLS = "meal_id, timestamp, date_str, notes, items"
+_MEAL_KEYS = ("meal_id", "timestamp", "date_str", "notes", "items")
+_MEAL_SUMMARY_KEYS = (
+    "id",
+    "meal_id",
+    "timestamp",
+    "date_str",
+    "notes",
+    "item_count",
+    "total_kcal",
+    "total_protein_g",
+    "total_carbs_g",
+    "total_fat_g",
+)
+_CORRECTION_KEYS = (
+    "correction_id",
+    "meal_id",
+    "timestamp",
+    "date_str",
+    "item_id",
+    "corrected_label",
+    "corrected_grams",
+    "original_label",
+    "original_grams",
+    "grams_delta",
+)
+_CORRECTION_COLS = ", ".join(_CORRECTION_KEYS)
+
+# SQLite's built-in lower() only folds ASCII, so name lookups against the
+# name_lc column must fold the bound parameter the same way (str.lower would
+# also fold e.g. "É" and then miss rows SQLite stored as "É").
+_SQLITE_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def _meal_from_row(row: tuple) -> Dict[str, Any]:
+    meal = dict(zip(_MEAL_KEYS, row))
+    meal["items"] = orjson.loads(meal["items"] or "[]")
+    return meal
 
 
 class NutriLensSQLiteDB:
@@ -24,15 +83,40 @@ class NutriLensSQLiteDB:
         self.db_path = os.getenv("DATABASE_URL", "sqlite:///./unified_dev.db").replace(
             "sqlite:///./", ""
         )
+        # Bumped on every catalogue write; nutrition.get_food_index() rebuilds on change.
+        self.foods_version = 0
+        # One long-lived connection shared by FastAPI's threadpool; every
+        # cursor use is serialised through _lock. Reusing the connection keeps
+        # its statement cache warm; the default size (128, spelled out here)
+        # already covers every distinct SQL string below.
+        self._conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=128,
+        )
+        for pragma in _CONNECTION_PRAGMAS:
+            self._conn.execute(pragma)
+        self._lock = threading.Lock()
+        atexit.register(self._conn.close)
         self._create_tables()
 
     def _get_connection(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        return self._conn
+
+    @contextmanager
+    def _locked(self) -> Iterator[sqlite3.Connection]:
+        """Hold the connection lock; roll back a half-done write on error."""
+        with self._lock:
+            try:
+                yield self._conn
+            except Exception:
+                if self._conn.in_transaction:
+                    self._conn.rollback()
+                raise
 
     def _create_tables(self) -> None:
         conn = self._get_connection()
+        conn.execute("PRAGMA journal_mode=WAL")
         cursor = conn.cursor()
         cursor.executescript("""
             CREATE TABLE IF NOT EXISTS foods (
@@ -41,7 +125,8 @@ class NutriLensSQLiteDB:
                 kcal_per_100g        REAL NOT NULL,
                 protein_g_per_100g   REAL NOT NULL,
                 carbs_g_per_100g     REAL NOT NULL,
-                fat_g_per_100g       REAL NOT NULL
+                fat_g_per_100g       REAL NOT NULL,
+                name_lc              TEXT GENERATED ALWAYS AS (lower(name)) VIRTUAL
             );
 
             CREATE TABLE IF NOT EXISTS meals (
@@ -52,6 +137,8 @@ class NutriLensSQLiteDB:
                 items     TEXT DEFAULT '[]'
             );
 
+            CREATE INDEX IF NOT EXISTS idx_meals_date_str ON meals(date_str);
+
             CREATE TABLE IF NOT EXISTS meal_corrections (
                 correction_id   TEXT PRIMARY KEY,
                 meal_id         TEXT NOT NULL,
@@ -80,23 +167,34 @@ class NutriLensSQLiteDB:
                 updated_at TEXT NOT NULL
             );
         """)
+        # Databases created before name_lc existed get the column in place.
+        columns = {row[1] for row in conn.execute("PRAGMA table_xinfo(foods)")}
+        if "name_lc" not in columns:
+            conn.execute(FOODS_ADD_NAME_LC_SQL)
+        # Same index name as the SQLAlchemy model (Food.name_lc, index=True),
+        # so a file initialised by both paths ends up with a single index.
+        conn.execute("DROP INDEX IF EXISTS idx_foods_name_lc")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_foods_name_lc ON foods(name_lc)")
         conn.commit()
-        conn.close()
 
     # ==================== FOODS ====================
 
     def seed_foods(self, foods: List[Dict[str, Any]]) -> int:
-        """Idempotent bulk-insert of foods. Returns newly inserted count."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        inserted = 0
-        for food in foods:
-            cursor.execute("SELECT food_id FROM foods WHERE food_id = ?", (food["food_id"],))
-            if cursor.fetchone() is None:
-                cursor.execute(
-                    """INSERT INTO foods
-                         (food_id, name, kcal_per_100g, protein_g_per_100g, carbs_g_per_100g, fat_g_per_100g)
-                       VALUES (?, ?, ?, ?, ?, ?)""",
+        """
+        Idempotent bulk-insert of foods. Returns newly inserted count.
+
+        One executemany of INSERT OR IGNORE inside a single transaction, so the
+        whole seed costs one commit rather than a SELECT + INSERT per row.
+        """
+        with self._locked() as conn:
+            cursor = conn.cursor()
+            changes_before = conn.total_changes
+            cursor.execute("BEGIN")
+            cursor.executemany(
+                """INSERT OR IGNORE INTO foods
+                     (food_id, name, kcal_per_100g, protein_g_per_100g, carbs_g_per_100g, fat_g_per_100g)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                [
                     (
                         food["food_id"],
                         food["name"],
@@ -104,78 +202,51 @@ class NutriLensSQLiteDB:
                         food["protein_g_per_100g"],
                         food["carbs_g_per_100g"],
                         food["fat_g_per_100g"],
-                    ),
-                )
-                inserted += 1
-        conn.commit()
-        conn.close()
+                    )
+                    for food in foods
+                ],
+            )
+            conn.commit()
+            inserted = conn.total_changes - changes_before
+        if inserted:
+            self.foods_version += 1
         return inserted
 
     def get_all_foods(self) -> List[Dict[str, Any]]:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM foods")
-        rows = cursor.fetchall()
-        conn.close()
+        with self._locked() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {_FOOD_COLS} FROM foods")
+            rows = cursor.fetchall()
         # Map database field names (with _g suffix) to API field names (without _g)
-        foods = []
-        for row in rows:
-            food_dict = dict(row)
-            foods.append({
-                "food_id": food_dict["food_id"],
-                "name": food_dict["name"],
-                "kcal_per_100g": food_dict["kcal_per_100g"],
-                "protein_per_100g": food_dict["protein_g_per_100g"],
-                "carbs_per_100g": food_dict["carbs_g_per_100g"],
-                "fat_per_100g": food_dict["fat_g_per_100g"],
-            })
-        return foods
+        return [dict(zip(_FOOD_KEYS, row)) for row in rows]
 
     def get_food_by_id(self, food_id: str) -> Optional[Dict[str, Any]]:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM foods WHERE food_id = ?", (food_id,))
-        row = cursor.fetchone()
-        conn.close()
+        with self._locked() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {_FOOD_COLS} FROM foods WHERE food_id = ?", (food_id,))
+            row = cursor.fetchone()
         if row:
-            food_dict = dict(row)
-            return {
-                "food_id": food_dict["food_id"],
-                "name": food_dict["name"],
-                "kcal_per_100g": food_dict["kcal_per_100g"],
-                "protein_per_100g": food_dict["protein_g_per_100g"],
-                "carbs_per_100g": food_dict["carbs_g_per_100g"],
-                "fat_per_100g": food_dict["fat_g_per_100g"],
-            }
+            return dict(zip(_FOOD_KEYS, row))
         return None
 
     def get_food_by_name(self, name: str) -> Optional[Dict[str, Any]]:
         """Exact, case-insensitive match."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT * FROM foods WHERE LOWER(name) = LOWER(?)", (name.strip(),)
-        )
-        row = cursor.fetchone()
-        conn.close()
+        with self._locked() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT {_FOOD_COLS} FROM foods WHERE name_lc = ?",
+                (name.strip().translate(_SQLITE_LOWER),),
+            )
+            row = cursor.fetchone()
         if row:
-            food_dict = dict(row)
-            return {
-                "food_id": food_dict["food_id"],
-                "name": food_dict["name"],
-                "kcal_per_100g": food_dict["kcal_per_100g"],
-                "protein_per_100g": food_dict["protein_g_per_100g"],
-                "carbs_per_100g": food_dict["carbs_g_per_100g"],
-                "fat_per_100g": food_dict["fat_g_per_100g"],
-            }
+            return dict(zip(_FOOD_KEYS, row))
         return None
 
     def get_food_count(self) -> int:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM foods")
-        count = cursor.fetchone()[0]
-        conn.close()
+        with self._locked() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM foods")
+            count = cursor.fetchone()[0]
         return count
 
     def save_food(self, food: Dict[str, Any]) -> Dict[str, Any]:
@@ -184,41 +255,41 @@ class NutriLensSQLiteDB:
         if not food_id:
             raise ValueError("food_id is required")
         
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        with self._locked() as conn:
+            cursor = conn.cursor()
         
-        # Map API field names (without _g) to database column names (with _g)
-        cursor.execute(
-            """
-            INSERT INTO foods (food_id, name, kcal_per_100g, protein_g_per_100g, carbs_g_per_100g, fat_g_per_100g)
-            VALUES (?, ?, ?, ?, ?, ?)
-            ON CONFLICT(food_id) DO UPDATE SET
-                name = excluded.name,
-                kcal_per_100g = excluded.kcal_per_100g,
-                protein_g_per_100g = excluded.protein_g_per_100g,
-                carbs_g_per_100g = excluded.carbs_g_per_100g,
-                fat_g_per_100g = excluded.fat_g_per_100g
-            """,
-            (
-                food_id,
-                food.get("name", ""),
-                food.get("kcal_per_100g", 0),
-                food.get("protein_per_100g", 0.0),
-                food.get("carbs_per_100g", 0.0),
-                food.get("fat_per_100g", 0.0),
-            ),
-        )
-        conn.commit()
-        conn.close()
+            # Map API field names (without _g) to database column names (with _g)
+            cursor.execute(
+                """
+                INSERT INTO foods (food_id, name, kcal_per_100g, protein_g_per_100g, carbs_g_per_100g, fat_g_per_100g)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(food_id) DO UPDATE SET
+                    name = excluded.name,
+                    kcal_per_100g = excluded.kcal_per_100g,
+                    protein_g_per_100g = excluded.protein_g_per_100g,
+                    carbs_g_per_100g = excluded.carbs_g_per_100g,
+                    fat_g_per_100g = excluded.fat_g_per_100g
+                """,
+                (
+                    food_id,
+                    food.get("name", ""),
+                    food.get("kcal_per_100g", 0),
+                    food.get("protein_per_100g", 0.0),
+                    food.get("carbs_per_100g", 0.0),
+                    food.get("fat_per_100g", 0.0),
+                ),
+            )
+            conn.commit()
+        self.foods_version += 1
         return food
 
     def delete_food(self, food_id: str) -> None:
         """Delete a food record."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM foods WHERE food_id = ?", (food_id,))
-        conn.commit()
-        conn.close()
+        with self._locked() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM foods WHERE food_id = ?", (food_id,))
+            conn.commit()
+        self.foods_version += 1
 
     # ==================== MEALS ====================
 
@@ -228,17 +299,19 @@ class NutriLensSQLiteDB:
         timestamp: str,
         notes: Optional[str],
         items: List[Dict[str, Any]],
+        totals: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
+        # `totals` is accepted for interface parity with Firestore; SQLite
+        # derives day totals from the stored items instead.
         date_str = timestamp[:10]
-        items_json = json.dumps(items)
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO meals (meal_id, timestamp, date_str, notes, items) VALUES (?, ?, ?, ?, ?)",
-            (meal_id, timestamp, date_str, notes or "", items_json),
-        )
-        conn.commit()
-        conn.close()
+        items_json = orjson.dumps(items).decode()
+        with self._locked() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO meals (meal_id, timestamp, date_str, notes, items) VALUES (?, ?, ?, ?, ?)",
+                (meal_id, timestamp, date_str, notes or "", items_json),
+            )
+            conn.commit()
         return {
             "id": meal_id,
             "meal_id": meal_id,
@@ -249,72 +322,123 @@ class NutriLensSQLiteDB:
         }
 
     def get_meals_by_date(self, date_str: str) -> List[Dict[str, Any]]:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM meals WHERE date_str = ?", (date_str,))
-        rows = cursor.fetchall()
-        conn.close()
-        result = []
-        for row in rows:
-            meal = dict(row)
-            meal["items"] = json.loads(meal.get("items", "[]"))
-            result.append(meal)
-        return result
+        with self._locked() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {_MEAL_COLS} FROM meals WHERE date_str = ?", (date_str,))
+            rows = cursor.fetchall()
+        return [_meal_from_row(row) for row in rows]
+
+    def get_meal_summaries_by_date(self, date_str: str) -> List[Dict[str, Any]]:
+        """
+        Return meal summaries (no embedded items) for an exact date_str.
+
+        Same fields as the Firestore backend; item counts and per-meal totals
+        are aggregated in SQL over json_each(items), so no items JSON is
+        decoded in Python.
+        """
+        with self._locked() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT m.meal_id, m.meal_id, m.timestamp, m.date_str, m.notes,
+                       json_array_length(m.items),
+                       COALESCE(SUM(json_extract(i.value, '$.kcal')), 0),
+                       COALESCE(SUM(json_extract(i.value, '$.protein_g')), 0.0),
+                       COALESCE(SUM(json_extract(i.value, '$.carbs_g')), 0.0),
+                       COALESCE(SUM(json_extract(i.value, '$.fat_g')), 0.0)
+                FROM meals AS m LEFT JOIN json_each(m.items) AS i
+                WHERE m.date_str = ?
+                GROUP BY m.rowid
+                """,
+                (date_str,),
+            )
+            rows = cursor.fetchall()
+        # Round macros the way POST /meals rounds the totals it stores in
+        # Firestore (Python round; SQLite's ROUND differs on ties).
+        return [
+            dict(zip(_MEAL_SUMMARY_KEYS, (*row[:7], *(round(v, 1) for v in row[7:]))))
+            for row in rows
+        ]
+
+    def get_meal_totals_by_date(self, date_str: str) -> Dict[str, Any]:
+        """
+        Return summed kcal / macros for all meals on date_str.
+
+        Aggregated in SQL with JSON1's json_each over the embedded items, so
+        no items JSON is decoded in Python.
+        """
+        with self._locked() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT COALESCE(SUM(json_extract(i.value, '$.kcal')), 0),
+                       COALESCE(SUM(json_extract(i.value, '$.protein_g')), 0.0),
+                       COALESCE(SUM(json_extract(i.value, '$.carbs_g')), 0.0),
+                       COALESCE(SUM(json_extract(i.value, '$.fat_g')), 0.0)
+                FROM meals AS m, json_each(m.items) AS i
+                WHERE m.date_str = ?
+                """,
+                (date_str,),
+            )
+            row = cursor.fetchone()
+        return dict(zip(("total_kcal", "total_protein_g", "total_carbs_g", "total_fat_g"), row))
+
+    def get_meal_by_id(self, meal_id: str) -> Optional[Dict[str, Any]]:
+        with self._locked() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {_MEAL_COLS} FROM meals WHERE meal_id = ?", (meal_id,))
+            row = cursor.fetchone()
+        if not row:
+            return None
+        return _meal_from_row(row)
 
     def get_meals_by_date_range(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
         """Return all meals between start_date and end_date (inclusive, YYYY-MM-DD format)."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT * FROM meals WHERE date_str >= ? AND date_str <= ? ORDER BY timestamp DESC",
-            (start_date, end_date),
-        )
-        rows = cursor.fetchall()
-        conn.close()
-        result = []
-        for row in rows:
-            meal = dict(row)
-            meal["items"] = json.loads(meal.get("items", "[]"))
-            result.append(meal)
-        return result
+        with self._locked() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT {_MEAL_COLS} FROM meals WHERE date_str >= ? AND date_str <= ? ORDER BY timestamp DESC",
+                (start_date, end_date),
+            )
+            rows = cursor.fetchall()
+        return [_meal_from_row(row) for row in rows]
 
     def save_corrections(self, corrections: List[Dict[str, Any]]) -> int:
         if not corrections:
             return 0
 
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        inserted = 0
+        with self._locked() as conn:
+            cursor = conn.cursor()
+            inserted = 0
 
-        for correction in corrections:
-            correction_id = correction.get("correction_id") or str(uuid.uuid4())
-            timestamp = correction.get("timestamp") or datetime.utcnow().isoformat()
-            date_str = correction.get("date_str") or timestamp[:10]
+            for correction in corrections:
+                correction_id = correction.get("correction_id") or str(uuid.uuid4())
+                timestamp = correction.get("timestamp") or datetime.utcnow().isoformat()
+                date_str = correction.get("date_str") or timestamp[:10]
 
-            cursor.execute(
-                """
-                INSERT INTO meal_corrections (
-                    correction_id, meal_id, timestamp, date_str, item_id,
-                    corrected_label, corrected_grams, original_label, original_grams, grams_delta
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    correction_id,
-                    correction.get("meal_id", ""),
-                    timestamp,
-                    date_str,
-                    correction.get("item_id"),
-                    correction.get("corrected_label", ""),
-                    int(correction.get("corrected_grams", 0)),
-                    correction.get("original_label"),
-                    correction.get("original_grams"),
-                    int(correction.get("grams_delta", 0)),
-                ),
-            )
-            inserted += 1
+                cursor.execute(
+                    """
+                    INSERT INTO meal_corrections (
+                        correction_id, meal_id, timestamp, date_str, item_id,
+                        corrected_label, corrected_grams, original_label, original_grams, grams_delta
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        correction_id,
+                        correction.get("meal_id", ""),
+                        timestamp,
+                        date_str,
+                        correction.get("item_id"),
+                        correction.get("corrected_label", ""),
+                        int(correction.get("corrected_grams", 0)),
+                        correction.get("original_label"),
+                        correction.get("original_grams"),
+                        int(correction.get("grams_delta", 0)),
+                    ),
+                )
+                inserted += 1
 
-        conn.commit()
-        conn.close()
+            conn.commit()
         return inserted
 
     def get_corrections(
@@ -323,81 +447,78 @@ class NutriLensSQLiteDB:
         end_date: Optional[str] = None,
         limit: int = 100,
     ) -> List[Dict[str, Any]]:
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        with self._locked() as conn:
+            cursor = conn.cursor()
 
-        query = "SELECT * FROM meal_corrections"
-        params: List[Any] = []
-        filters: List[str] = []
+            query = f"SELECT {_CORRECTION_COLS} FROM meal_corrections"
+            params: List[Any] = []
+            filters: List[str] = []
 
-        if start_date:
-            filters.append("date_str >= ?")
-            params.append(start_date)
-        if end_date:
-            filters.append("date_str <= ?")
-            params.append(end_date)
+            if start_date:
+                filters.append("date_str >= ?")
+                params.append(start_date)
+            if end_date:
+                filters.append("date_str <= ?")
+                params.append(end_date)
 
-        if filters:
-            query += " WHERE " + " AND ".join(filters)
+            if filters:
+                query += " WHERE " + " AND ".join(filters)
 
-        query += " ORDER BY timestamp DESC LIMIT ?"
-        params.append(limit)
+            query += " ORDER BY timestamp DESC LIMIT ?"
+            params.append(limit)
 
-        cursor.execute(query, tuple(params))
-        rows = cursor.fetchall()
-        conn.close()
+            cursor.execute(query, tuple(params))
+            rows = cursor.fetchall()
 
-        return [dict(row) for row in rows]
+        return [dict(zip(_CORRECTION_KEYS, row)) for row in rows]
 
     # ==================== SETTINGS ====================
 
     def get_nutrilens_setting(self, key: str) -> Optional[Dict[str, Any]]:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT setting_key, setting_value, updated_by, updated_at FROM nutrilens_settings WHERE setting_key = ?",
-            (key,),
-        )
-        row = cursor.fetchone()
-        conn.close()
+        with self._locked() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT setting_key, setting_value, updated_by, updated_at FROM nutrilens_settings WHERE setting_key = ?",
+                (key,),
+            )
+            row = cursor.fetchone()
         if not row:
             return None
-        payload = dict(row)
+        setting_key, setting_value, updated_by, updated_at = row
         return {
-            "key": payload.get("setting_key"),
-            "value": payload.get("setting_value"),
-            "updated_by": payload.get("updated_by"),
-            "updated_at": payload.get("updated_at"),
+            "key": setting_key,
+            "value": setting_value,
+            "updated_by": updated_by,
+            "updated_at": updated_at,
         }
 
     def set_nutrilens_setting(self, key: str, value: str, updated_by: str) -> Dict[str, Any]:
         updated_at = datetime.utcnow().isoformat()
         user = updated_by or "system"
 
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO nutrilens_settings (setting_key, setting_value, updated_by, updated_at)
-            VALUES (?, ?, ?, ?)
-            ON CONFLICT(setting_key) DO UPDATE SET
-                setting_value = excluded.setting_value,
-                updated_by = excluded.updated_by,
-                updated_at = excluded.updated_at
-            """,
-            (key, value, user, updated_at),
-        )
+        with self._locked() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                INSERT INTO nutrilens_settings (setting_key, setting_value, updated_by, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(setting_key) DO UPDATE SET
+                    setting_value = excluded.setting_value,
+                    updated_by = excluded.updated_by,
+                    updated_at = excluded.updated_at
+                """,
+                (key, value, user, updated_at),
+            )
 
-        audit_id = str(uuid.uuid4())
-        cursor.execute(
-            """
-            INSERT INTO nutrilens_settings_audit (audit_id, setting_key, setting_value, updated_by, updated_at)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (audit_id, key, value, user, updated_at),
-        )
-        conn.commit()
-        conn.close()
+            audit_id = str(uuid.uuid4())
+            cursor.execute(
+                """
+                INSERT INTO nutrilens_settings_audit (audit_id, setting_key, setting_value, updated_by, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (audit_id, key, value, user, updated_at),
+            )
+            conn.commit()
 
         return {
             "key": key,
@@ -407,29 +528,28 @@ class NutriLensSQLiteDB:
         }
 
     def get_nutrilens_setting_audit(self, key: str, limit: int = 20) -> List[Dict[str, Any]]:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT audit_id, setting_key, setting_value, updated_by, updated_at
-            FROM nutrilens_settings_audit
-            WHERE setting_key = ?
-            ORDER BY updated_at DESC
-            LIMIT ?
-            """,
-            (key, max(1, int(limit))),
-        )
-        rows = cursor.fetchall()
-        conn.close()
+        with self._locked() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT audit_id, setting_key, setting_value, updated_by, updated_at
+                FROM nutrilens_settings_audit
+                WHERE setting_key = ?
+                ORDER BY updated_at DESC
+                LIMIT ?
+                """,
+                (key, max(1, int(limit))),
+            )
+            rows = cursor.fetchall()
         return [
             {
-                "id": row["audit_id"],
-                "key": row["setting_key"],
-                "value": row["setting_value"],
-                "updated_by": row["updated_by"],
-                "updated_at": row["updated_at"],
+                "id": audit_id,
+                "key": setting_key,
+                "value": setting_value,
+                "updated_by": updated_by,
+                "updated_at": updated_at,
             }
-            for row in rows
+            for audit_id, setting_key, setting_value, updated_by, updated_at in rows
         ]
 
 
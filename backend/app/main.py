@@ -4,6 +4,7 @@ import os
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from app.api.routes_meals import router as meals_router
 from app.api.routes_foods import router as foods_router
@@ -19,27 +20,17 @@ from app.leave_tracker.api import (
 logger = logging.getLogger(__name__)
 load_dotenv()
 
-# ─── Food seed data (mirrors seed.py but uses plain dicts for db_factory) ────
-from app.db.seed import FOOD_SEED_DATA as _SEED
+# ─── Food seed data (built once in seed.py as read-only dicts for db_factory) ─
+from app.db.seed import FOOD_SEED_DICTS
 
 
 def _seed_data():
-    return [
-        {
-            "food_id": row[0],
-            "name": row[1],
-            "kcal_per_100g": row[2],
-            "protein_g_per_100g": row[3],
-            "carbs_g_per_100g": row[4],
-            "fat_g_per_100g": row[5],
-        }
-        for row in _SEED
-    ]
+    return FOOD_SEED_DICTS
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialise DB and seed foods on startup."""
+    """Initialise DB, seed foods and warm the food index on startup."""
     from app.db.db_factory import db
     food_count = db.get_food_count()
     if food_count == 0:
@@ -47,6 +38,16 @@ async def lifespan(app: FastAPI):
         logger.info(f"Seeded {n} food(s) into the nutrition DB.")
     else:
         logger.info(f"Nutrition DB already has {food_count} food(s) — skipping seed.")
+    # Firestore only: give meals saved before totals were denormalised their
+    # total_* / item_count fields (no-op once it has run).
+    if hasattr(db, "backfill_meal_totals"):
+        backfilled = db.backfill_meal_totals()
+        if backfilled:
+            logger.info(f"Backfilled totals on {backfilled} meal(s).")
+    # Prime the per-process food index so the first analyze/save request does
+    # not pay for the catalogue read.
+    from app.services.nutrition import get_food_index
+    get_food_index(db)
     yield
 
 
@@ -55,6 +56,7 @@ app = FastAPI(
     version="0.3.0",
     description="Single backend hosting NutriLens and Leave Tracker services",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware for development and production.
@@ -12,7 +12,7 @@ import re
 import time
 from datetime import datetime
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Mapping, Optional
 
 try:
     from google import genai
@@ -75,6 +75,12 @@ CANNED_FOODS = {
     },
 }
 
+_CANNED_KEYS = tuple(CANNED_FOODS.keys())
+_CANNED_TEMPLATES = tuple(CANNED_FOODS.values())
+
+# Deterministic mock analysis only hashes this much of the first image.
+DETERMINISTIC_HASH_PREFIX_BYTES = 64 * 1024
+
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "").strip()
 GEMINI_MODEL = os.getenv("NUTRILENS_ANALYSIS_MODEL", os.getenv("GEMINI_MODEL", "gemini-2.0-flash-lite"))
 FALLBACK_GEMINI_MODELS = [
@@ -577,13 +583,17 @@ def build_analysis_response_from_ai_payload(
     )
 
 
+def gemini_analysis_enabled() -> bool:
+    return bool(GEMINI_API_KEY and _genai_client is not None and genai_types is not None)
+
+
 async def analyze_images(
     image_bytes: List[bytes],
     metadata: Dict[str, Any],
 ) -> AnalyzeMealResponse:
     _increment_metric("analyze_requests_total")
     analysis: AnalyzeMealResponse
-    if GEMINI_API_KEY and _genai_client is not None and genai_types is not None:
+    if gemini_analysis_enabled():
         try:
             analysis = await analyze_images_gemini(image_bytes, metadata)
             return _apply_feedback_rules_to_response(analysis)
@@ -595,6 +605,22 @@ async def analyze_images(
     return _apply_feedback_rules_to_response(analysis)
 
 
+async def analyze_image_streams(
+    image_streams: List[Any],
+    metadata: Mapping[str, Any],
+) -> AnalyzeMealResponse:
+    """
+    Deterministic analysis straight from async file-likes (e.g. UploadFile).
+
+    Only the first DETERMINISTIC_HASH_PREFIX_BYTES of the first stream are
+    read; the rest only count towards the photo total. Used instead of
+    analyze_images when Gemini is disabled, so uploads are never buffered.
+    """
+    _increment_metric("analyze_requests_total")
+    analysis = await analyze_images_deterministic_stream(image_streams, metadata)
+    return _apply_feedback_rules_to_response(analysis)
+
+
 async def analyze_images_gemini(
     image_bytes: List[bytes],
     metadata: Dict[str, Any],
@@ -651,14 +677,48 @@ Output schema:
     return build_analysis_response_from_ai_payload(payload, len(image_bytes))
 
 
+def _build_canned_response(food_key: str, food_template: Dict[str, Any], needs_more: bool) -> AnalyzeMealResponse:
+    item = AnalyzeItem(
+        item_id="tmp-1",
+        label=food_template["label"],
+        label_confidence=food_template["label_confidence"],
+        grams_estimate=food_template["grams_estimate"],
+        grams_range=GramsRange(**food_template["grams_range"]),
+        grams_confidence=food_template["grams_confidence"],
+        macros=Macros(**food_template["macros"]),
+    )
+    return AnalyzeMealResponse(
+        overall_confidence=0.65 if needs_more else 0.75,
+        needs_more_photos=needs_more,
+        suggested_next_shots=["top_down", "lower_left_angle", "lower_right_angle"] if needs_more else [],
+        items=[item],
+        warnings=["oil_sauce_uncertain"] if "oil" in food_key else [],
+    )
+
+
+def _new_image_hasher():
+    return hashlib.blake2b(digest_size=8, usedforsecurity=False)
+
+
+def _canned_response_for(digest: bytes, photo_count: int) -> AnalyzeMealResponse:
+    # Pick food based on hash. Built per call: a fresh model is cheaper than
+    # deep-copying a shared template, and callers are free to mutate it.
+    food_index = int.from_bytes(digest, byteorder='big') % len(_CANNED_KEYS)
+    return _build_canned_response(
+        _CANNED_KEYS[food_index],
+        _CANNED_TEMPLATES[food_index],
+        needs_more=photo_count < 5,
+    )
+
+
 async def analyze_images_deterministic(
     image_bytes: List[bytes],
-    metadata: Dict[str, Any],
+    metadata: Mapping[str, Any],
 ) -> AnalyzeMealResponse:
     """
     Deterministic mock analysis using image hash.
     
-    - Hash the first image's bytes
+    - Hash the first 64 KiB of the first image (blake2b, 8-byte digest)
     - Pick canned food based on hash mod len(CANNED_FOODS)
     - Return consistent output
     - If only 3-4 photos, suggest more
@@ -673,39 +733,30 @@ async def analyze_images_deterministic(
     if not image_bytes:
         raise ValueError("At least one image required")
     
-    # Hash first image for determinism
-    first_hash = hashlib.md5(image_bytes[0]).digest()
-    hash_int = int.from_bytes(first_hash, byteorder='big')
-    
-    # Pick food based on hash
-    food_keys = list(CANNED_FOODS.keys())
-    food_key = food_keys[hash_int % len(food_keys)]
-    food_template = CANNED_FOODS[food_key]
-    
-    # Build response
-    item = AnalyzeItem(
-        item_id="tmp-1",
-        label=food_template["label"],
-        label_confidence=food_template["label_confidence"],
-        grams_estimate=food_template["grams_estimate"],
-        grams_range=GramsRange(**food_template["grams_range"]),
-        grams_confidence=food_template["grams_confidence"],
-        macros=Macros(**food_template["macros"]),
-    )
-    
-    photo_count = len(image_bytes)
-    needs_more = photo_count < 5
-    
-    suggested_shots = []
-    if needs_more:
-        suggested_shots = ["top_down", "lower_left_angle", "lower_right_angle"]
-    
-    overall_conf = 0.65 if photo_count < 5 else 0.75
-    
-    return AnalyzeMealResponse(
-        overall_confidence=overall_conf,
-        needs_more_photos=needs_more,
-        suggested_next_shots=suggested_shots,
-        items=[item],
-        warnings=["oil_sauce_uncertain"] if "oil" in food_key else [],
-    )
+    # Hash first image for determinism. The hash only feeds a modulo, so a
+    # short non-cryptographic digest of the leading bytes is enough.
+    hasher = _new_image_hasher()
+    hasher.update(image_bytes[0][:DETERMINISTIC_HASH_PREFIX_BYTES])
+    return _canned_response_for(hasher.digest(), len(image_bytes))
+
+
+async def analyze_images_deterministic_stream(
+    image_streams: List[Any],
+    metadata: Mapping[str, Any],
+) -> AnalyzeMealResponse:
+    """
+    Same result as analyze_images_deterministic, hashing the first stream
+    incrementally so at most DETERMINISTIC_HASH_PREFIX_BYTES are held.
+    """
+    if not image_streams:
+        raise ValueError("At least one image required")
+
+    hasher = _new_image_hasher()
+    remaining = DETERMINISTIC_HASH_PREFIX_BYTES
+    while remaining > 0:
+        chunk = await image_streams[0].read(remaining)
+        if not chunk:
+            break
+        hasher.update(chunk)
+        remaining -= len(chunk)
+    return _canned_response_for(hasher.digest(), len(image_streams))
@@ -3,12 +3,17 @@ Nutrition calculation service — Milestone 3 / Phase P2.
 - In-memory NUTRITION_DB retained for mock analysis backward compat.
 - DB-backed functions now use the db_factory abstraction (dict-based),
   compatible with both SQLite dev and Firestore production.
-- Fuzzy food name matching via difflib (stdlib, no extra dep).
+- Fuzzy food name matching via rapidfuzz, served from a per-process food
+  index that is rebuilt when the catalogue changes.
 """
 
-import difflib
+import os
+import time
+from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
+from rapidfuzz import fuzz, process
+
 
 # ─── In-memory DB (used by deterministic mock analysis service) ──────────────
 # These stay in sync with the CANNED_FOODS in analysis.py.
@@ -62,38 +67,96 @@ def _normalize(name: str) -> str:
     return name.lower().strip()
 
 
+FOOD_INDEX_TTL_SECONDS = int(os.getenv("NUTRILENS_FOOD_INDEX_TTL_SECONDS", "300"))
+
+
+@dataclass
+class FoodIndex:
+    db: Any
+    version: int
+    expires_at: float
+    foods: List[Dict[str, Any]]
+    names: List[str]
+    by_name: Dict[str, Dict[str, Any]]
+
+
+_food_index: Optional[FoodIndex] = None
+
+
+def _build_food_index(db: Any, foods: List[Dict[str, Any]], version: int) -> FoodIndex:
+    names = [_normalize(f["name"]) for f in foods]
+    by_name: Dict[str, Dict[str, Any]] = {}
+    for name, food in zip(names, foods):
+        by_name.setdefault(name, food)
+    return FoodIndex(
+        db=db,
+        version=version,
+        expires_at=time.time() + FOOD_INDEX_TTL_SECONDS,
+        foods=foods,
+        names=names,
+        by_name=by_name,
+    )
+
+
+def get_food_index(db: Any) -> FoodIndex:
+    """
+    Return the cached food index for `db`, rebuilding it when the backend's
+    `foods_version` has moved (seed/save/delete on this process) or the TTL
+    has expired (catalogue edits made by other instances).
+    """
+    global _food_index
+
+    version = getattr(db, "foods_version", 0)
+    index = _food_index
+    if (
+        index is not None
+        and index.db is db
+        and index.version == version
+        and time.time() < index.expires_at
+    ):
+        return index
+
+    _food_index = _build_food_index(db, db.get_all_foods(), version)
+    return _food_index
+
+
 def get_food_fuzzy(db: Any, label: str) -> Optional[Dict[str, Any]]:
     """
     Find a food dict by fuzzy matching the given label.
 
     `db` is the db_factory singleton (NutriLensFirestoreDB or NutriLensSQLiteDB).
+    Matching runs against the cached per-process food index (see
+    get_food_index), so it does not touch the database on the request path.
 
     Strategy (in order):
-    1. Exact match via db.get_food_by_name()
+    1. Exact (normalised) name match
     2. Label is a substring of any food name (or vice-versa)
-    3. Best difflib closest match (cutoff 0.55)
+    3. Best rapidfuzz ratio match (score cutoff 55)
 
     Returns a food dict or None if nothing is close enough.
     """
     norm_label = _normalize(label)
 
+    index = get_food_index(db)
+
     # 1. Exact match
-    food = db.get_food_by_name(norm_label)
+    food = index.by_name.get(norm_label)
     if food:
         return food
 
-    # 2 & 3. Load all foods, run substring + difflib
-    all_foods: List[Dict[str, Any]] = db.get_all_foods()
-    for f in all_foods:
-        if norm_label in _normalize(f["name"]) or _normalize(f["name"]) in norm_label:
+    # 2. Substring match
+    for name, f in zip(index.names, index.foods):
+        if norm_label in name or name in norm_label:
             return f
 
-    names = [_normalize(f["name"]) for f in all_foods]
-    matches = difflib.get_close_matches(norm_label, names, n=1, cutoff=0.55)
-    if matches:
-        for f in all_foods:
-            if _normalize(f["name"]) == matches[0]:
-                return f
+    # 3. rapidfuzz over the pre-normalised names (processor=None: no re-lowering).
+    # fuzz.ratio is the C++ counterpart of difflib's ratio, so the old 0.55
+    # cutoff carries over as 55 (WRatio's partial scoring over-matches here).
+    match = process.extractOne(
+        norm_label, index.names, scorer=fuzz.ratio, processor=None, score_cutoff=55
+    )
+    if match:
+        return index.by_name[match[0]]
 
     return None
 
@@ -1,54 +1,166 @@
-"""Unit tests for analysis service."""
+"""Unit tests for analysis service.
+
+The service is async; tests drive it with asyncio.run rather than through
+pytest-asyncio, so they are plain functions.
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+from types import MappingProxyType
+from typing import Optional
 
 import pytest
-from app.services.analysis import analyze_images_deterministic, build_analysis_response_from_ai_payload
-
-
-@pytest.mark.asyncio
-async def test_analyze_with_three_images():
-    """Test deterministic analysis with minimum photos"""
-    # Create some dummy image data
-    image_bytes = [b"image1", b"image2", b"image3"]
-    
-    result = await analyze_images_deterministic(image_bytes, {})
-    
-    assert result.overall_confidence > 0
+from app.services import analysis
+from app.services.analysis import (
+    analyze_images_deterministic,
+    analyze_images_deterministic_stream,
+    build_analysis_response_from_ai_payload,
+)
+
+
+# Shared read-only metadata; the deterministic path never mutates it.
+_EMPTY = MappingProxyType({})
+
+
+class _AsyncBytesStream:
+    """Minimal UploadFile stand-in with an async read().
+
+    `max_read` caps the bytes returned per call, like a socket-backed upload.
+    """
+
+    def __init__(self, data: bytes, max_read: Optional[int] = None):
+        self._buffer = io.BytesIO(data)
+        self._max_read = max_read
+
+    async def read(self, size: int = -1) -> bytes:
+        if self._max_read is not None and (size < 0 or size > self._max_read):
+            size = self._max_read
+        return self._buffer.read(size)
+
+
+def _digest(result) -> str:
+    """SHA-256 of the whole response, serialised with sorted keys."""
+    payload = json.dumps(result.model_dump(), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@pytest.fixture(scope="module")
+def three_imgs():
+    return (b"image1", b"image2", b"image3")
+
+
+@pytest.fixture(scope="module")
+def five_imgs():
+    return tuple(f"img{i}".encode() for i in range(1, 6))
+
+
+@pytest.fixture(scope="module")
+def analyze_cache():
+    """Memoised analyze_images_deterministic, keyed by the image bytes."""
+    cache = {}
+
+    def run(image_bytes):
+        key = tuple(image_bytes)
+        if key not in cache:
+            cache[key] = asyncio.run(analyze_images_deterministic(list(image_bytes), _EMPTY))
+        return cache[key]
+
+    return run
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize(
+    "images_fixture,min_confidence,needs_more",
+    [
+        # Minimum photo count: usable result, but more shots suggested
+        ("three_imgs", 0.0, True),
+        # Preferred photo count: higher confidence, nothing more needed
+        ("five_imgs", 0.70, False),
+    ],
+)
+def test_analyze(request, analyze_cache, images_fixture, min_confidence, needs_more):
+    """Test deterministic analysis at the minimum and preferred photo counts"""
+    result = analyze_cache(request.getfixturevalue(images_fixture))
+
+    assert result.overall_confidence > min_confidence
+    assert result.needs_more_photos is needs_more
+    assert bool(result.suggested_next_shots) is needs_more
     assert len(result.items) == 1
     assert result.items[0].grams_range.min <= result.items[0].grams_estimate <= result.items[0].grams_range.max
     assert result.items[0].macros.kcal > 0
 
 
-@pytest.mark.asyncio
-async def test_analyze_with_five_images():
-    """Test deterministic analysis with preferred photo count"""
-    image_bytes = [b"img1", b"img2", b"img3", b"img4", b"img5"]
-    
-    result = await analyze_images_deterministic(image_bytes, {})
-    
-    # With 5 photos, should not need more
-    assert result.needs_more_photos is False
-    assert len(result.suggested_next_shots) == 0
-    assert result.overall_confidence > 0.70
-
-
-@pytest.mark.asyncio
-async def test_analyze_deterministic_consistency():
-    """Test that same image bytes produce consistent results"""
-    image_bytes = [b"same_image", b"dummy2", b"dummy3"]
-    
-    result1 = await analyze_images_deterministic(image_bytes, {})
-    result2 = await analyze_images_deterministic(image_bytes, {})
-    
-    # Same inputs → same label
-    assert result1.items[0].label == result2.items[0].label
-    assert result1.items[0].grams_estimate == result2.items[0].grams_estimate
-
-
-@pytest.mark.asyncio
-async def test_analyze_no_images_error():
-    """Test that empty image list raises error"""
-    with pytest.raises(ValueError):
-        await analyze_images_deterministic([], {})
+@pytest.mark.slow
+def test_analyze_deterministic_consistency(analyze_cache, three_imgs):
+    """Test that same image bytes produce identical results"""
+    expected = _digest(analyze_cache(three_imgs))
+
+    # Recompute outside the cache: same inputs → byte-identical response
+    for _ in range(3):
+        result = asyncio.run(analyze_images_deterministic(list(three_imgs), _EMPTY))
+        assert _digest(result) == expected
+
+
+@pytest.mark.slow
+def test_analyze_result_is_not_shared(three_imgs):
+    """Mutating one result must not leak into the next call"""
+    first = asyncio.run(analyze_images_deterministic(list(three_imgs), _EMPTY))
+    expected = _digest(first)
+
+    first.items[0].label = "mutated"
+    first.items[0].macros.kcal = -1
+    first.warnings.append("mutated")
+    first.suggested_next_shots.clear()
+
+    second = asyncio.run(analyze_images_deterministic(list(three_imgs), _EMPTY))
+    assert _digest(second) == expected
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("first", [
+    b"tiny",  # shorter than one read
+    bytes(range(256)) * 256,  # exactly the hashed prefix
+    bytes(range(256)) * 256 + b"x",  # one byte past it
+    bytes(range(256)) * 512,  # 128 KiB, twice the prefix
+], ids=["short", "prefix", "prefix+1", "128k"])
+@pytest.mark.parametrize("read_size", [None, 1000], ids=["whole", "chunked"])
+def test_analyze_stream_matches_bytes(monkeypatch, first, read_size):
+    """Streamed hashing feeds the same digest as the bytes path"""
+    digests = []
+    canned = analysis._canned_response_for
+
+    def _record(digest, photo_count):
+        digests.append(digest)
+        return canned(digest, photo_count)
+
+    monkeypatch.setattr(analysis, "_canned_response_for", _record)
+    image_bytes = [first, b"dummy2", b"dummy3"]
+
+    expected = asyncio.run(analyze_images_deterministic(image_bytes, _EMPTY))
+    result = asyncio.run(analyze_images_deterministic_stream(
+        [_AsyncBytesStream(data, read_size) for data in image_bytes], _EMPTY
+    ))
+
+    prefix = first[:analysis.DETERMINISTIC_HASH_PREFIX_BYTES]
+    reference = hashlib.blake2b(prefix, digest_size=8).digest()
+    assert digests == [reference, reference]
+    assert result == expected
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize(
+    "fn,images,exc,match",
+    [
+        (analyze_images_deterministic, [], ValueError, "At least one image required"),
+        (analyze_images_deterministic_stream, [], ValueError, "At least one image required"),
+    ],
+)
+def test_analyze_errors(fn, images, exc, match):
+    """Test that an empty image list raises error"""
+    with pytest.raises(exc, match=match):
+        asyncio.run(fn(images, _EMPTY))
 
 
 def test_build_analysis_response_from_ai_payload_normalizes_values():
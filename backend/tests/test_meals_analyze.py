@@ -0,0 +1,72 @@
+"""
+TestClient tests for the POST /meals/analyze upload size cap (413).
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+MAX_BYTES = 1024
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Meals routes on a tmp_path SQLite DB with a 1 KiB per-image cap."""
+    monkeypatch.setenv("ENVIRONMENT", "development")
+    monkeypatch.setenv("DATABASE_URL", str(tmp_path / "analyze.db"))
+
+    from app.api import routes_meals
+    from app.db.sqlite_db_cloud import NutriLensSQLiteDB
+    from app.services import analysis
+
+    db = NutriLensSQLiteDB()
+    monkeypatch.setattr(routes_meals, "db", db)
+    monkeypatch.setattr(analysis, "db", db)
+    monkeypatch.setattr(routes_meals, "MAX_IMAGE_BYTES", MAX_BYTES)
+    # Smaller than the cap, so an oversized upload is rejected mid-read.
+    monkeypatch.setattr(routes_meals, "_UPLOAD_CHUNK_BYTES", 256)
+
+    app = FastAPI()
+    app.include_router(routes_meals.router, prefix="/meals")
+    return TestClient(app)
+
+
+@pytest.fixture(params=[False, True], ids=["deterministic", "gemini"])
+def gemini_enabled(request, monkeypatch):
+    """Route through either analysis branch; the Gemini call itself is stubbed."""
+    from app.api import routes_meals
+    from app.services.analysis import analyze_images_deterministic
+
+    enabled = request.param
+    monkeypatch.setattr(routes_meals, "gemini_analysis_enabled", lambda: enabled)
+
+    async def _fake_analyze_images(image_bytes, metadata):
+        assert all(len(data) <= MAX_BYTES for data in image_bytes)
+        return await analyze_images_deterministic(image_bytes, metadata)
+
+    monkeypatch.setattr(routes_meals, "analyze_images", _fake_analyze_images)
+    return enabled
+
+
+def _post_images(client, sizes):
+    files = [("images", (f"img{i}.jpg", b"\xff" * size, "image/jpeg")) for i, size in enumerate(sizes)]
+    return client.post("/meals/analyze", files=files)
+
+
+@pytest.mark.parametrize(
+    "sizes,status",
+    [
+        ([MAX_BYTES, 10, 10], 200),  # exactly at the cap
+        ([10, MAX_BYTES + 1, 10], 413),
+        ([10, 10, 4 * MAX_BYTES], 413),
+    ],
+    ids=["at-cap", "one-byte-over", "far-over"],
+)
+def test_analyze_upload_size_cap(client, gemini_enabled, sizes, status):
+    response = _post_images(client, sizes)
+
+    assert response.status_code == status
+    if status == 413:
+        assert response.json() == {"detail": "Image too large"}
+    else:
+        assert len(response.json()["items"]) == 1
@@ -0,0 +1,140 @@
+"""
+SQLite-backed tests for the meal read paths (day totals, summaries, by-id).
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+DAY = "2024-05-01"
+EMPTY_DAY = "2024-05-02"
+
+_MEALS = [
+    {
+        "timestamp": f"{DAY}T08:00:00",
+        "notes": "breakfast",
+        "items": [
+            {"label": "white rice", "grams": 150,
+             "macros": {"kcal": 0, "protein_g": 0, "carbs_g": 0, "fat_g": 0}},
+            {"label": "chicken breast", "grams": 120,
+             "macros": {"kcal": 0, "protein_g": 0, "carbs_g": 0, "fat_g": 0}},
+        ],
+    },
+    {
+        "timestamp": f"{DAY}T19:30:00",
+        "items": [
+            {"label": "zzqq mystery stew", "grams": 200,
+             "macros": {"kcal": 310, "protein_g": 12.4, "carbs_g": 20.15, "fat_g": 9.3}},
+        ],
+    },
+]
+
+
+@pytest.fixture
+def meals_db(tmp_path, monkeypatch):
+    """A fresh NutriLensSQLiteDB in tmp_path, wired into the meals routes."""
+    monkeypatch.setenv("ENVIRONMENT", "development")
+    monkeypatch.setenv("DATABASE_URL", str(tmp_path / "meals.db"))
+
+    from app.api import routes_meals
+    from app.db.seed import FOOD_SEED_DICTS
+    from app.db.sqlite_db_cloud import NutriLensSQLiteDB
+
+    db = NutriLensSQLiteDB()
+    db.seed_foods([dict(f) for f in FOOD_SEED_DICTS])
+    monkeypatch.setattr(routes_meals, "db", db)
+    return db
+
+
+@pytest.fixture
+def client(meals_db):
+    from app.api.routes_meals import router
+
+    app = FastAPI()
+    app.include_router(router, prefix="/meals")
+    return TestClient(app)
+
+
+@pytest.fixture
+def saved_meal_ids(client):
+    ids = []
+    for meal in _MEALS:
+        response = client.post("/meals/", json=meal)
+        assert response.status_code == 200
+        ids.append(response.json()["meal_id"])
+    return ids
+
+
+def test_day_totals_match_include_items(meals_db, client, saved_meal_ids):
+    """The include_items=false totals agree with the full per-item path"""
+    full = client.get("/meals/today", params={"date": DAY}).json()
+    light = client.get("/meals/today", params={"date": DAY, "include_items": "false"}).json()
+
+    assert full["meal_count"] == light["meal_count"] == 2
+    for key in ("total_kcal", "total_protein_g", "total_carbs_g", "total_fat_g"):
+        assert light[key] == pytest.approx(full[key], abs=0.05), key
+
+    expected = {m["meal_id"]: (m["item_count"], m["total_kcal"]) for m in full["meals"]}
+    assert set(expected) == set(saved_meal_ids)
+    for summary in light["meals"]:
+        assert "items" not in summary
+        assert (summary["item_count"], summary["total_kcal"]) == expected[summary["meal_id"]]
+
+    totals = meals_db.get_meal_totals_by_date(DAY)
+    assert totals["total_kcal"] == full["total_kcal"]
+    assert totals["total_protein_g"] == pytest.approx(full["total_protein_g"], abs=0.05)
+
+
+def test_meal_summaries_match_firestore_shape(meals_db, saved_meal_ids):
+    """SQLite summaries carry the same fields as the Firestore projection"""
+    from app.db.firestore_db import NutriLensFirestoreDB
+
+    summaries = meals_db.get_meal_summaries_by_date(DAY)
+    assert [s["meal_id"] for s in summaries] == saved_meal_ids
+
+    for summary in summaries:
+        assert set(summary) == {"id", *NutriLensFirestoreDB.MEAL_SUMMARY_FIELDS}
+        items = meals_db.get_meal_by_id(summary["meal_id"])["items"]
+        assert summary["item_count"] == len(items)
+        assert summary["total_kcal"] == sum(it["kcal"] for it in items)
+        for macro in ("protein_g", "carbs_g", "fat_g"):
+            expected = round(sum(it[macro] for it in items), 1)
+            assert summary[f"total_{macro}"] == pytest.approx(expected), macro
+
+
+def test_empty_day_returns_zeros(meals_db, client, saved_meal_ids):
+    assert meals_db.get_meal_totals_by_date(EMPTY_DAY) == {
+        "total_kcal": 0,
+        "total_protein_g": 0.0,
+        "total_carbs_g": 0.0,
+        "total_fat_g": 0.0,
+    }
+    assert meals_db.get_meal_summaries_by_date(EMPTY_DAY) == []
+
+    response = client.get("/meals/today", params={"date": EMPTY_DAY, "include_items": "false"})
+    assert response.status_code == 200
+    assert response.json() == {
+        "total_kcal": 0,
+        "total_protein_g": 0.0,
+        "total_carbs_g": 0.0,
+        "total_fat_g": 0.0,
+        "meal_count": 0,
+        "meals": [],
+    }
+
+
+def test_get_meal_by_id(meals_db, client, saved_meal_ids):
+    meal_id = saved_meal_ids[0]
+
+    meal = meals_db.get_meal_by_id(meal_id)
+    assert meal["meal_id"] == meal_id
+    assert meal["date_str"] == DAY
+    assert meal["notes"] == "breakfast"
+    assert [it["label"] for it in meal["items"]] == ["white rice", "chicken breast"]
+
+    response = client.get(f"/meals/{meal_id}")
+    assert response.status_code == 200
+    assert response.json() == meal
+
+    assert meals_db.get_meal_by_id("no-such-meal") is None
+    assert client.get("/meals/no-such-meal").status_code == 404
@@ -3,45 +3,88 @@ Unit tests for nutrition calculation service.
 """
 
 import pytest
-from app.services.nutrition import compute_macros, compute_total_macros
+from app.services.nutrition import compute_macros, compute_total_macros, get_food_fuzzy
 
 
-def test_compute_macros_white_rice():
-    """Test macro calculation for white rice"""
-    result = compute_macros("white rice", 100)
-    assert result["kcal"] == 130
-    assert result["protein_g"] == 2.7
-    assert result["carbs_g"] == 28.7
-    assert result["fat_g"] == 0.3
+@pytest.mark.parametrize(
+    "label,grams,expected",
+    [
+        ("white rice", 100, {"kcal": 130, "protein_g": 2.7, "carbs_g": 28.7, "fat_g": 0.3}),
+        # kcal: 165 * 150 / 100 = 247.5 → 248; fat: 0.9 * 150 / 100 = 1.35 → 1.4
+        ("chicken breast", 150, {"kcal": 248, "protein_g": 54.0, "carbs_g": 0.0, "fat_g": 1.4}),
+    ],
+)
+def test_compute_macros(label, grams, expected):
+    """Test macro calculation per nutrition DB row"""
+    assert compute_macros(label, grams) == pytest.approx(expected, abs=0.05)
 
 
-def test_compute_macros_chicken_breast():
-    """Test macro calculation for chicken breast"""
-    result = compute_macros("chicken breast", 150)
-    assert result["kcal"] == 248  # 165 * 150 / 100 = 247.5 → rounds to 248
-    assert result["protein_g"] == 54.0  # 36.0 * 150 / 100
-    assert result["carbs_g"] == 0.0
-    assert result["fat_g"] == 1.4  # 0.9 * 150 / 100 = 1.35 → rounds to 1.4
+@pytest.mark.parametrize(
+    "fn,args,exc,match",
+    [
+        (compute_macros, ("unknown food", 100), ValueError, "not found in nutrition DB"),
+        (
+            compute_total_macros,
+            ([{"label": "white rice", "grams": 100}, {"label": "unknown food", "grams": 50}],),
+            ValueError,
+            "not found in nutrition DB",
+        ),
+    ],
+)
+def test_errors(fn, args, exc, match):
+    """Test that unknown foods raise ValueError"""
+    with pytest.raises(exc, match=match):
+        fn(*args)
 
 
-def test_compute_macros_unknown_food():
-    """Test that unknown food raises ValueError"""
-    with pytest.raises(ValueError, match="not found in nutrition DB"):
-        compute_macros("unknown food", 100)
+@pytest.fixture(scope="session")
+def rice_and_chicken_totals():
+    """compute_total_macros for one meal, computed once for every assertion."""
+    return compute_total_macros([
+        {"label": "white rice", "grams": 180},
+        {"label": "chicken breast", "grams": 150},
+    ])
 
 
-def test_compute_total_macros():
+# White rice: 130*180/100=234, protein=4.86, carbs=51.66, fat=0.54
+# Chicken: 165*150/100=247.5≈248, protein=54.0, carbs=0, fat=1.35
+# Total: kcal=234+248=482, protein=58.9, carbs=51.7, fat=1.9
+@pytest.mark.parametrize(
+    "field,expected",
+    [("kcal", 482), ("protein_g", 58.9), ("carbs_g", 51.7), ("fat_g", 1.9)],
+)
+def test_compute_total_macros(rice_and_chicken_totals, field, expected):
     """Test summing macros across items"""
-    items = [
-        {"label": "white rice", "grams": 180},
-        {"label": "chicken breast", "grams": 150},
-    ]
-    result = compute_total_macros(items)
-    
-    # White rice: 130*180/100=234, protein=4.86, carbs=51.66, fat=0.54
-    # Chicken: 165*150/100=247.5≈248, protein=54.0, carbs=0, fat=1.35
-    # Total: kcal=234+248=482, protein=58.9, carbs=51.7, fat=1.9
-    assert result["kcal"] == 482
-    assert result["protein_g"] == 58.9
-    assert result["carbs_g"] == 51.7
-    assert result["fat_g"] == 1.9
+    assert rice_and_chicken_totals[field] == pytest.approx(expected, abs=0.05)
+
+
+class _FakeFoodDB:
+    """Minimal db_factory stand-in that counts catalogue reads."""
+
+    def __init__(self, foods):
+        self.foods = foods
+        self.foods_version = 0
+        self.get_all_foods_calls = 0
+
+    def get_all_foods(self):
+        self.get_all_foods_calls += 1
+        return list(self.foods)
+
+
+def test_get_food_fuzzy_uses_cached_index_until_catalogue_changes():
+    """Food index is built once per catalogue version, not per lookup"""
+    db = _FakeFoodDB([
+        {"food_id": "white_rice", "name": "white rice"},
+        {"food_id": "broccoli", "name": "broccoli"},
+    ])
+
+    assert get_food_fuzzy(db, "White Rice")["food_id"] == "white_rice"
+    assert get_food_fuzzy(db, "steamed broccoli")["food_id"] == "broccoli"
+    assert get_food_fuzzy(db, "brocoli")["food_id"] == "broccoli"
+    assert get_food_fuzzy(db, "zzqq") is None
+    assert db.get_all_foods_calls == 1
+
+    db.foods.append({"food_id": "tempeh", "name": "tempeh"})
+    db.foods_version += 1
+    assert get_food_fuzzy(db, "tempeh")["food_id"] == "tempeh"
+    assert db.get_all_foods_calls == 2
@@ -0,0 +1,61 @@
+"""
+Tests for the Milestone 3 SQLAlchemy session helpers.
+"""
+
+import sqlite3
+
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import Session
+
+from app.db.models import Food
+from app.db.session import init_db
+
+
+def test_init_db_upgrades_baseline_foods_table(tmp_path):
+    """init_db adds foods.name_lc (and its index) to a pre-existing foods table"""
+    db_path = tmp_path / "baseline.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE foods (
+            food_id VARCHAR NOT NULL,
+            name VARCHAR NOT NULL,
+            kcal_per_100g FLOAT NOT NULL,
+            protein_g_per_100g FLOAT NOT NULL,
+            carbs_g_per_100g FLOAT NOT NULL,
+            fat_g_per_100g FLOAT NOT NULL,
+            PRIMARY KEY (food_id)
+        );
+        CREATE UNIQUE INDEX ix_foods_name ON foods (name);
+        INSERT INTO foods VALUES ('white_rice', 'White Rice', 130, 2.7, 28.7, 0.3);
+    """)
+    conn.commit()
+    conn.close()
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    init_db(bind=engine)
+    init_db(bind=engine)  # idempotent
+
+    index_names = {ix["name"] for ix in inspect(engine).get_indexes("foods")}
+    assert "ix_foods_name_lc" in index_names
+
+    with Session(engine) as session:
+        assert session.query(Food).count() == 1
+        food = session.query(Food).filter(Food.name_lc == "white rice").one()
+        assert food.food_id == "white_rice"
+    engine.dispose()
+
+
+def test_raw_sqlite_and_init_db_share_the_name_lc_index(tmp_path, monkeypatch):
+    """A file set up by both the sqlite3 backend and init_db has one name_lc index"""
+    db_path = tmp_path / "unified.db"
+    monkeypatch.setenv("DATABASE_URL", str(db_path))
+    from app.db.sqlite_db_cloud import NutriLensSQLiteDB
+
+    NutriLensSQLiteDB()._conn.close()
+    engine = create_engine(f"sqlite:///{db_path}")
+    init_db(bind=engine)
+
+    indexes = inspect(engine).get_indexes("foods")
+    name_lc_indexes = [ix["name"] for ix in indexes if ix["column_names"] == ["name_lc"]]
+    assert name_lc_indexes == ["ix_foods_name_lc"]
+    engine.dispose()